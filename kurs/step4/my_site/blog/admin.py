@@ -1,11 +1,84 @@
+import json
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count
+from django.utils.functional import cached_property
+from django.http import StreamingHttpResponse
 from .models import Post, Comment
 
-admin.site.register(Post)
+
+def _stream_posts_json(rows):
+    """Отдает посты в формате posts.json по одному, не держа весь список в памяти"""
+    yield '[\n'
+    for i, (title, content, user_id) in enumerate(rows):
+        item = json.dumps({'title': title, 'content': content, 'user_id': user_id}, ensure_ascii=False)
+        yield ('  ' if i == 0 else ',\n  ') + item
+    yield '\n]\n'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для всей таблицы на PostgreSQL берет оценку числа строк
+    из pg_class вместо COUNT(*). Для фильтрованных выборок и других СУБД
+    считает как обычно.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or queryset.query.where:
+            return super().count
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # -1 (PostgreSQL 14+) или 0 (до 14) - таблица еще не анализировалась; точный COUNT пустой таблицы дешев
+        if row is None or row[0] <= 0:
+            return super().count
+        return row[0]
+
+
+class EstimatedCountAdminMixin:
+    """Миксин для ModelAdmin больших таблиц: без точного COUNT(*) в списке объектов"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    list_display = ('title', 'author', 'date_posted', 'comments_count', 'avg_rating', 'ratings_count')
+    list_select_related = ('author',)
+    actions = ['export_json']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author').annotate(n_comments=Count('comments'))
+
+    @admin.display(description='Комментарии', ordering='n_comments')
+    def comments_count(self, obj):
+        return obj.n_comments
+
+    @admin.action(description='Экспортировать в JSON')
+    def export_json(self, request, queryset):
+        # iterator() читает строки порциями курсора (на PostgreSQL - серверным курсором)
+        rows = (
+            Post.objects.filter(pk__in=queryset.values('pk'))
+            .order_by('id')
+            .values_list('title', 'content', 'author_id')
+            .iterator(chunk_size=500)
+        )
+        response = StreamingHttpResponse(_stream_posts_json(rows), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="posts.json"'
+        return response
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     list_display = ('text', 'author', 'post', 'created_date')
+    list_select_related = ('author', 'post')
     list_filter = ('created_date', 'author')
     search_fields = ('text', 'author__username')
     date_hierarchy = 'created_date'
\ No newline at end of file
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'blog'  # Должно быть именно 'blog', без лишних точек
\ No newline at end of file
+    name = 'blog'  # Должно быть именно 'blog', без лишних точек
+
+    def ready(self):
+        from . import signals
\ No newline at end of file
@@ -10,4 +10,10 @@ class CommentForm(forms.ModelForm):
                 'class': 'form-control',
                 'rows': 3
             }),
-        }
\ No newline at end of file
+        }
+
+
+class RatingForm(forms.Form):
+    """Проверка данных AJAX-запроса на оценку поста"""
+    post_id = forms.IntegerField()
+    value = forms.IntegerField(min_value=1, max_value=5)
\ No newline at end of file
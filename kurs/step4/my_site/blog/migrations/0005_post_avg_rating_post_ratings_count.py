@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-15 12:00
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def fill_rating_stats(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.annotate(avg=Avg('ratings__value'), total=Count('ratings')):
+        post.avg_rating = post.avg or 0
+        post.ratings_count = post.total
+        post.save(update_fields=['avg_rating', 'ratings_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_remove_comment_approved_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='avg_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_stats, migrations.RunPython.noop),
+    ]
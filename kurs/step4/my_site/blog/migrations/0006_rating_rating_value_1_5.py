@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_avg_rating_post_ratings_count'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='rating',
+            constraint=models.CheckConstraint(condition=models.Q(('value__gte', 1), ('value__lte', 5)), name='rating_value_1_5'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_post_date_desc_comment_comm_post_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='approved_comment',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
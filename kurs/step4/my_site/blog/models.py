@@ -2,24 +2,52 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.urls import reverse
-from django.db.models import Avg
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 class Post(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
     date_posted = models.DateTimeField(default=timezone.now)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Денормализованные значения, обновляются сигналами Rating
+    avg_rating = models.FloatField(default=0)
+    ratings_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date_posted'], name='post_date_desc'),  # Сортировка ленты постов
+        ]
 
     def approved_comments(self):
         """Возвращает одобренные комментарии к посту"""
         return self.comments.filter(approved_comment=True)
 
     def average_rating(self):
-        """Вычисляет средний рейтинг поста"""
-        return self.ratings.aggregate(Avg('value'))['value__avg'] or 0
+        """Возвращает средний рейтинг поста"""
+        return self.avg_rating
+
+    def update_rating_stats(self):
+        """Пересчитывает средний рейтинг и количество оценок поста и обновляет их в объекте"""
+        Post.refresh_rating_stats(Post.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['avg_rating', 'ratings_count'])
+
+    @staticmethod
+    def refresh_rating_stats(queryset):
+        """
+        Пересчитывает рейтинг постов queryset одним UPDATE с подзапросами: агрегат и запись
+        в одном выражении, поэтому параллельные оценки не оставляют устаревших значений
+        """
+        ratings = Rating.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        queryset.update(
+            avg_rating=Coalesce(Subquery(ratings.annotate(avg=Avg('value')).values('avg')), 0.0),
+            ratings_count=Coalesce(Subquery(ratings.annotate(total=Count('id')).values('total')), 0)
+        )
 
     def user_rating(self, user):
         """Возвращает оценку пользователя для поста"""
+        if hasattr(self, 'my_rating'):  # оценки текущего пользователя уже подгружены
+            return self.my_rating[0].value if self.my_rating else 0
         try:
             return self.ratings.get(user=user).value
         except self.ratings.model.DoesNotExist:
@@ -36,6 +64,12 @@ class Comment(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     text = models.TextField()
     created_date = models.DateTimeField(default=timezone.now)
+    approved_comment = models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-created_date'], name='comm_post_date'),
+        ]
 
     def __str__(self):
         return f"{self.author.username}: {self.text[:50]}"
@@ -48,6 +82,9 @@ class Rating(models.Model):
 
     class Meta:
         unique_together = ('post', 'user')  # Один пользователь - одна оценка на пост
+        constraints = [
+            models.CheckConstraint(condition=models.Q(value__gte=1, value__lte=5), name='rating_value_1_5'),
+        ]
         verbose_name = 'Оценка'
         verbose_name_plural = 'Оценки'
 
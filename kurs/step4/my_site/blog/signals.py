@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Post, Rating
+
+
+@receiver(post_save, sender=Rating)
+def update_post_rating(sender, instance, **kwargs):
+    """
+    Обновляет сохраненный в посте средний рейтинг и количество оценок
+    после добавления или изменения оценки.
+    """
+    Post.refresh_rating_stats(Post.objects.filter(pk=instance.post_id))
+
+
+@receiver(post_delete, sender=Rating)
+def update_post_rating_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Обновляет рейтинг поста после удаления оценки. При каскадном удалении поста
+    пересчет не нужен: строка поста удаляется вместе с оценками.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is Post:
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    if origin_model is User:
+        # Посты удаляемых пользователей исчезают в том же каскаде
+        posts = posts.exclude(author__in=origin if isinstance(origin, QuerySet) else [origin])
+    Post.refresh_rating_stats(posts)
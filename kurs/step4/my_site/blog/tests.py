@@ -1,3 +1,99 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Post, Rating
+
+
+class RatePostTests(TestCase):
+    """Оценка поста через AJAX: upsert оценки и пересчет рейтинга"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pass12345')
+        cls.reader = User.objects.create_user('reader', password='pass12345')
+        cls.other = User.objects.create_user('other', password='pass12345')
+        cls.post = Post.objects.create(title='Пост', content='Текст', author=cls.author)
+
+    def rate(self, user, value, post_id=None):
+        self.client.force_login(user)
+        return self.client.post(reverse('rate-post'), {
+            'post_id': self.post.pk if post_id is None else post_id,
+            'value': value,
+        })
+
+    def test_new_rating(self):
+        response = self.rate(self.reader, 4)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'success': True, 'average_rating': 4.0, 'user_rating': 4, 'total_ratings': 1
+        })
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.avg_rating, self.post.ratings_count), (4.0, 1))
+
+    def test_update_existing_rating(self):
+        self.rate(self.other, 2)
+        self.rate(self.reader, 5)
+        response = self.rate(self.reader, 3)
+        data = response.json()
+        self.assertEqual(data['total_ratings'], 2)
+        self.assertEqual(data['average_rating'], 2.5)
+        self.assertEqual(Rating.objects.get(post=self.post, user=self.reader).value, 3)
+
+    def test_invalid_value(self):
+        for value in (0, 6, 'abc'):
+            response = self.rate(self.reader, value)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Rating.objects.exists())
+
+
+class RatePostMissingPostTests(TransactionTestCase):
+    """Несуществующий пост отсекает внешний ключ при фиксации транзакции, поэтому без обертки TestCase"""
+
+    def test_missing_post(self):
+        user = User.objects.create_user('reader', password='pass12345')
+        self.client.force_login(user)
+        response = self.client.post(reverse('rate-post'), {'post_id': 999999, 'value': 3})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Rating.objects.exists())
+
+
+class RatingStatsSignalTests(TestCase):
+    """Пересчет avg_rating и ratings_count при удалении оценок, постов и пользователей"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='pass12345')
+        self.bob = User.objects.create_user('bob', password='pass12345')
+        self.carol = User.objects.create_user('carol', password='pass12345')
+        self.bob_post = Post.objects.create(title='Пост Боба', content='Текст', author=self.bob)
+        self.alice_post = Post.objects.create(title='Пост Алисы', content='Текст', author=self.alice)
+        Rating.objects.create(post=self.bob_post, user=self.alice, value=5)
+        Rating.objects.create(post=self.bob_post, user=self.carol, value=2)
+        Rating.objects.create(post=self.alice_post, user=self.bob, value=4)
+
+    def assertStats(self, post, avg, count):
+        post.refresh_from_db()
+        self.assertEqual((post.avg_rating, post.ratings_count), (avg, count))
+
+    def test_save_updates_stats(self):
+        self.assertStats(self.bob_post, 3.5, 2)
+        self.assertStats(self.alice_post, 4.0, 1)
+
+    def test_delete_rating(self):
+        Rating.objects.get(post=self.bob_post, user=self.carol).delete()
+        self.assertStats(self.bob_post, 5.0, 1)
+
+    def test_delete_last_rating(self):
+        Rating.objects.filter(post=self.alice_post).delete()
+        self.assertStats(self.alice_post, 0.0, 0)
+
+    def test_delete_post(self):
+        self.bob_post.delete()
+        self.assertFalse(Rating.objects.filter(post_id=self.bob_post.pk).exists())
+        self.assertStats(self.alice_post, 4.0, 1)
+
+    def test_delete_user(self):
+        # Пост Алисы удаляется каскадом, рейтинг поста Боба пересчитывается без ее оценки
+        self.alice.delete()
+        self.assertFalse(Post.objects.filter(pk=self.alice_post.pk).exists())
+        self.assertStats(self.bob_post, 2.0, 1)
@@ -19,6 +19,6 @@ urlpatterns = [
     path('post/<int:pk>/delete/', PostDeleteView.as_view(), name='post-delete'),
     path('about/', views.about, name='blog-about'),
     path('post/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
-    path('post/<int:pk>/rate/', views.rate_post, name='rate-post'),
+    path('rate/', views.rate_post, name='rate-post'),
     path('post/<int:post_id>/comment/', views.add_comment, name='add-comment'),
 ]
\ No newline at end of file
@@ -9,17 +9,39 @@ from django.views.generic import (
     UpdateView,
     DeleteView
 )
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Prefetch, Sum
+from django.db.models.functions import Length, Substr
+from django.db.models.lookups import GreaterThan
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 
-from .forms import CommentForm
-from .models import Post, Rating
+from .forms import CommentForm, RatingForm
+from .models import Post, Comment, Rating
+
+# Пустая форма комментария не хранит состояния запроса, поэтому создается один раз
+_BLANK_COMMENT_FORM = CommentForm()
+
+
+def with_related(queryset):
+    """Подгружает автора поста и его профиль (аватар) тем же запросом, без запроса на каждый пост"""
+    return queryset.select_related('author', 'author__profile')
+
+
+def for_list(queryset):
+    """Выбирает только поля, нужные ленте постов, первые 200 символов текста и признак обрезки"""
+    return queryset.only(
+        'id', 'title', 'date_posted', 'author', 'avg_rating', 'ratings_count'
+    ).annotate(
+        content_preview=Substr('content', 1, 200),
+        truncated=GreaterThan(Length('content'), 200)
+    )
 
 
 def home(request):
     context = {
-        'posts': Post.objects.all().order_by('-date_posted'),
+        'posts': for_list(with_related(Post.objects.all())).order_by('-date_posted'),
         'title': 'Главная страница'
     }
     return render(request, 'blog/home.html', context)
@@ -32,10 +54,20 @@ class PostListView(ListView):
     ordering = ['-date_posted']
     paginate_by = 5
 
+    def get_queryset(self):
+        return for_list(with_related(super().get_queryset()))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Главная страница'
-        context['form'] = CommentForm()
+        context['form'] = _BLANK_COMMENT_FORM
+        # Ключ кэша фрагмента со списком постов (один запрос): меняется при появлении или
+        # удалении поста и при любой новой или измененной оценке
+        feed_state = Post.objects.aggregate(
+            latest=Max('date_posted'), total=Count('id'),
+            ratings=Sum('ratings_count'), avg_sum=Sum('avg_rating')
+        )
+        context['feed_state'] = '|'.join(str(value) for value in feed_state.values())
         return context
 
 
@@ -47,15 +79,26 @@ class UserPostListView(ListView):
 
     def get_queryset(self):
         user = get_object_or_404(User, username=self.kwargs.get('username'))
-        return Post.objects.filter(author=user).order_by('-date_posted')
+        return for_list(with_related(Post.objects.filter(author=user))).order_by('-date_posted')
 
 
 class PostDetailView(DetailView):
     model = Post
 
+    def get_queryset(self):
+        # Комментарии с авторами и оценка текущего пользователя - отдельными запросами на весь пост
+        queryset = with_related(super().get_queryset()).prefetch_related(
+            Prefetch('comments', queryset=Comment.objects.select_related('author'))
+        )
+        if self.request.user.is_authenticated:
+            queryset = queryset.prefetch_related(
+                Prefetch('ratings', queryset=Rating.objects.filter(user=self.request.user), to_attr='my_rating')
+            )
+        return queryset
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm()
+        context['form'] = _BLANK_COMMENT_FORM
         context['user_rating'] = self.object.user_rating(self.request.user) if self.request.user.is_authenticated else 0
         return context
 
@@ -97,21 +140,30 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 @login_required
 @require_POST
 def rate_post(request):
-    post_id = request.POST.get('post_id')
-    value = int(request.POST.get('value', 0))
-
-    if 1 <= value <= 5:
-        post = get_object_or_404(Post, id=post_id)
-        Rating.objects.update_or_create(
-            post=post,
-            user=request.user,
-            defaults={'value': value}
-        )
+    form = RatingForm(request.POST)
+
+    if form.is_valid():
+        value = form.cleaned_data['value']
+        post = Post(pk=form.cleaned_data['post_id'])
+        # Один INSERT ... ON CONFLICT DO UPDATE вместо SELECT поста + update_or_create;
+        # несуществующий пост отсекает внешний ключ
+        try:
+            with transaction.atomic():
+                Rating.objects.bulk_create(
+                    [Rating(post=post, user=request.user, value=value)],
+                    update_conflicts=True,
+                    update_fields=['value'],
+                    unique_fields=['post', 'user']
+                )
+        except IntegrityError:
+            raise Http404('Пост не найден')
+        # bulk_create не отправляет post_save, поэтому пересчитываем рейтинг сами
+        post.update_rating_stats()
         return JsonResponse({
             'success': True,
-            'average_rating': post.average_rating(),
+            'average_rating': post.avg_rating,
             'user_rating': value,
-            'total_ratings': post.ratings.count()
+            'total_ratings': post.ratings_count
         })
 
     return JsonResponse({'success': False}, status=400)
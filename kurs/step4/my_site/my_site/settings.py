@@ -9,8 +9,12 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Security
-SECRET_KEY = 'django-insecure-3wd@wh8dqf8d41ibwe#@onru3p@4^b%n-9x4_4!dq&&v4rixnw'
-DEBUG = True
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-3wd@wh8dqf8d41ibwe#@onru3p@4^b%n-9x4_4!dq&&v4rixnw'  # Только для разработки
+)
+# При DEBUG Django хранит каждый SQL-запрос в connection.queries, включаем только явно
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 # Application definition
@@ -66,10 +70,38 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+            # WAL: читатели не блокируются записью оценок; NORMAL в WAL безопасен и реже делает fsync
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA cache_size=-64000;'
+            ),
+        },
     }
 }
 
+# В продакшене - PostgreSQL: построчные блокировки вместо глобальной блокировки записи SQLite
+if os.environ.get('DJANGO_DB_ENGINE') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'my_site'),
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'server_side_binding': True,  # Подготовленные выражения, нужен psycopg 3
+        },
+    }
+
 # Password validation
+# DJANGO_PASSWORD_VALIDATION=minimal оставляет только проверку длины (для нагрузочных тестов)
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -84,6 +116,22 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
+if os.environ.get('DJANGO_PASSWORD_VALIDATION') == 'minimal':
+    AUTH_PASSWORD_VALIDATORS = [
+        {
+            'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+        },
+    ]
+
+# Хэширование паролей: число итераций PBKDF2 задается под сервер через DJANGO_PBKDF2_ITERATIONS,
+# чтобы регистрация и вход не занимали рабочий процесс на ~100 мс
+PASSWORD_HASHERS = [
+    'users.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
 
 # Internationalization
 LANGUAGE_CODE = 'ru-ru'  # Изменено на русский
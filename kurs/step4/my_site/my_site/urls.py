@@ -40,9 +40,6 @@ urlpatterns = [
          ),
          name='password_reset_complete'),
 
-    # Rating route
-    path('rate/', user_views.rate_post, name='rate-post'),
-
     # Blog routes
     path('', include('blog.urls')),
 ]
@@ -48,6 +48,13 @@ class UserUpdateForm(forms.ModelForm):
             raise ValidationError(_("Этот email уже используется."))
         return email
 
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if commit:
+            # Обновляем только поля формы, а не всю строку пользователя
+            user.save(update_fields=['username', 'email'])
+        return user
+
 
 class ProfileUpdateForm(forms.ModelForm):
     class Meta:
@@ -60,6 +67,12 @@ class ProfileUpdateForm(forms.ModelForm):
             'image': _('Изображение профиля')
         }
 
+    def save(self, commit=True):
+        profile = super().save(commit=False)
+        if commit:
+            profile.save(update_fields=['image'])
+        return profile
+
     def clean_image(self):
         image = self.cleaned_data.get('image')
         if image:
@@ -0,0 +1,10 @@
+import os
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 с числом итераций, подобранным под конкретный сервер (DJANGO_PBKDF2_ITERATIONS).
+    Алгоритм тот же, поэтому старые хэши проверяются и пересчитываются при входе.
+    """
+    iterations = int(os.environ.get('DJANGO_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-15 12:00
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # auth.User принадлежит другому приложению, поэтому AddIndex здесь неприменим:
+    # индекс по email (для проверки в clean_email) создается напрямую через SQL.
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX user_email_idx ON auth_user (email);',
+            reverse_sql='DROP INDEX user_email_idx;',
+        ),
+    ]
@@ -1,8 +1,8 @@
 from django.db.models.signals import post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from django.core.exceptions import ObjectDoesNotExist
 from .models import Profile
+from contextlib import contextmanager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +12,8 @@ def create_user_profile(sender, instance, created, **kwargs):
     """
     Создает профиль пользователя при создании нового пользователя.
     Обрабатывает возможные исключения при создании профиля.
+    Профиль при обычном сохранении пользователя (например, обновлении
+    last_login при входе) не трогаем: его поля меняет только ProfileUpdateForm.
     """
     if created:
         try:
@@ -21,18 +23,27 @@ def create_user_profile(sender, instance, created, **kwargs):
             logger.error(f"Ошибка при создании профиля для {instance.username}: {str(e)}")
             # Можно добавить дополнительную обработку ошибки
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+
+@contextmanager
+def disable_profile_signal():
     """
-    Сохраняет профиль пользователя при обновлении пользователя.
-    Проверяет существование профиля перед сохранением.
+    Временно отключает create_user_profile, например при загрузке
+    пользователей пачкой, когда профили создаются отдельно.
     """
+    post_save.disconnect(create_user_profile, sender=User)
     try:
-        instance.profile.save()
-        logger.debug(f"Профиль пользователя {instance.username} обновлен")
-    except ObjectDoesNotExist:
-        # Если профиль не существует, создаем его
-        Profile.objects.create(user=instance)
-        logger.warning(f"Профиль для {instance.username} не существовал, создан новый")
-    except Exception as e:
-        logger.error(f"Ошибка при сохранении профиля {instance.username}: {str(e)}")
\ No newline at end of file
+        yield
+    finally:
+        post_save.connect(create_user_profile, sender=User)
+
+
+def bulk_create_users(users):
+    """
+    Создает пользователей и их профили двумя запросами вместо 2N.
+    Возвращает список созданных пользователей.
+    """
+    with disable_profile_signal():
+        users = User.objects.bulk_create(users)
+    Profile.objects.bulk_create([Profile(user=user) for user in users], ignore_conflicts=True)
+    logger.info(f"Создано пользователей с профилями: {len(users)}")
+    return users
\ No newline at end of file
@@ -5,12 +5,44 @@ Auto Subtitle Generator v2.0
 """
 
 import os
+import re
 import sys
+import time
+import hashlib
+import shutil
 import argparse
+import fnmatch
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import yaml
+
+# Проверка наличия необходимых модулей до импорта компонентов, которые от них зависят
+try:
+    import yaml
+    import ffmpeg
+    
+    from audio_processor import AudioProcessor
+    from transcription_manager import TranscriptionManager
+    from post_processor import PostProcessor
+    from formatter_manager import FormatterManager
+    from quality_checker import QualityChecker
+except ImportError as e:
+    if __name__ != "__main__":
+        raise
+    print(f"Ошибка: Не установлены необходимые библиотеки: {e}")
+    print("Установите их: pip install -r requirements.txt")
+    sys.exit(1)
+
+try:
+    import orjson
+except ImportError:
+    import json
+    orjson = None
 
 # Настройка логирования
 logging.basicConfig(
@@ -23,6 +55,121 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Признаки превышения лимитов в сообщениях об ошибках провайдеров ASR
+RATE_LIMIT_MARKERS = ('too many requests', 'rate limit', 'quota')
+# Код 429 в тексте ошибки - только отдельным словом, а не как часть путей, размеров и т.п.
+HTTP_429_RE = re.compile(r'\b429\b')
+
+class RateLimiter:
+    """Ограничение частоты (запросов в секунду) и числа одновременных запросов к провайдеру"""
+    
+    def __init__(self, rps: float, max_concurrent: int):
+        self.interval = 1.0 / rps
+        self.semaphore = threading.Semaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+    
+    def __enter__(self):
+        self.semaphore.acquire()
+        # Резервируем момент отправки под блокировкой, а ждем уже без нее
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.semaphore.release()
+
+def is_transient_error(error: Exception) -> bool:
+    """Определение временной ошибки провайдера (лимиты, 5xx, сеть), которую имеет смысл повторить"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429 or (isinstance(status, int) and status >= 500):
+        return True
+    
+    message = str(error).lower()
+    return bool(HTTP_429_RE.search(message)) or any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+def fingerprint_file(path: str, sample_size: int = 65536) -> str:
+    """
+    Быстрый отпечаток файла: размер + начало, середина и конец (по 64 КиБ).
+    Читается не больше ~192 КиБ независимо от размера файла.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(size.to_bytes(8, 'little'))
+    with open(path, 'rb', buffering=0) as f:
+        digest.update(f.read(sample_size))
+        f.seek(max(0, size // 2 - sample_size // 2))
+        digest.update(f.read(sample_size))
+        f.seek(max(0, size - sample_size))
+        digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+def dump_transcription(transcription: Dict) -> bytes:
+    """Сериализация результата распознавания в байты для кэша (orjson, если установлен)"""
+    if orjson is not None:
+        return orjson.dumps(
+            transcription,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(transcription, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+def _json_default(value):
+    """Числа и массивы numpy в типы Python для stdlib json (как OPT_SERIALIZE_NUMPY у orjson)"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def load_transcription(data: bytes) -> Dict:
+    """Обратное преобразование для dump_transcription"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@dataclass(slots=True, frozen=True)
+class ValidatedConfig:
+    """Проверенные при загрузке параметры конфигурации, часто используемые при обработке"""
+    normalize: bool
+    noise_reduction: bool
+    target_sample_rate: int
+    channels: int
+    output_formats: Tuple[str, ...]
+    max_concurrency: int
+    
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'ValidatedConfig':
+        """Построение и проверка конфигурации: ошибки видны сразу, а не на середине пакета"""
+        try:
+            preprocessing = config['audio_preprocessing']
+            cfg = cls(
+                normalize=bool(preprocessing['normalize']),
+                noise_reduction=bool(preprocessing['noise_reduction']),
+                target_sample_rate=int(preprocessing['target_sample_rate']),
+                channels=int(preprocessing['channels']),
+                output_formats=tuple(config['output_formats']['enabled']),
+                max_concurrency=int(config.get('batch', {}).get('max_concurrency', 5))
+            )
+        except KeyError as e:
+            raise ValueError(f"В конфигурации отсутствует параметр {e}") from e
+        
+        if not 1 <= cfg.channels <= 2:
+            raise ValueError(f"channels должно быть 1 или 2, получено {cfg.channels}")
+        if not 8000 <= cfg.target_sample_rate <= 48000:
+            raise ValueError(f"target_sample_rate вне диапазона 8000-48000: {cfg.target_sample_rate}")
+        if not cfg.output_formats:
+            raise ValueError("Не выбран ни один выходной формат (output_formats.enabled)")
+        if cfg.max_concurrency < 1:
+            raise ValueError(f"max_concurrency должно быть не меньше 1, получено {cfg.max_concurrency}")
+        return cfg
+
 class AutoSubtitleGenerator:
     """Основной класс для автоматической генерации субтитров"""
     
@@ -39,6 +186,8 @@ class AutoSubtitleGenerator:
         except Exception as e:
             logger.error(f"Ошибка загрузки конфигурации: {e}")
             self.config = self.get_default_config()
+        
+        self.cfg = ValidatedConfig.from_dict(self.config)
     
     def get_default_config(self) -> Dict:
         """Резервная конфигурация по умолчанию"""
@@ -48,25 +197,133 @@ class AutoSubtitleGenerator:
                 'max_lines': 2,
                 'min_duration': 1.0,
                 'max_duration': 4.0
+            },
+            'audio_preprocessing': {
+                'normalize': True,
+                'noise_reduction': False,
+                'target_sample_rate': 16000,
+                'channels': 1
+            },
+            'output_formats': {
+                'enabled': ['srt']
             }
         }
     
     def setup_components(self):
         """Инициализация всех компонентов системы"""
-        from audio_processor import AudioProcessor
-        from transcription_manager import TranscriptionManager
-        from post_processor import PostProcessor
-        from formatter_manager import FormatterManager
-        from quality_checker import QualityChecker
-        
-        self.audio_processor = AudioProcessor(self.config)
+        self.audio_processor = AudioProcessor(self.config, settings=self.cfg)
         self.transcription_manager = TranscriptionManager(self.config)
         self.post_processor = PostProcessor(self.config)
         self.formatter_manager = FormatterManager(self.config)
         self.quality_checker = QualityChecker(self.config)
         
+        self.rate_limiters = {}
+        self.rate_limiters_lock = threading.Lock()
+        self.thread_local = threading.local()
+        
+        self.setup_cache()
+        
         logger.info("Все компоненты системы инициализированы")
     
+    def component(self, name: str):
+        """
+        Компонент для текущего потока. Потокобезопасность TranscriptionManager, PostProcessor,
+        QualityChecker и FormatterManager не гарантируется, поэтому рабочие потоки
+        получают собственные экземпляры, а основной поток использует общие
+        """
+        if threading.current_thread() is threading.main_thread():
+            return getattr(self, name)
+        instances = self.thread_local.__dict__
+        if name not in instances:
+            instances[name] = type(getattr(self, name))(self.config)
+        return instances[name]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        """Освобождение ресурсов компонентов (временные файлы, кэш)"""
+        for component in (self.audio_processor, self.transcription_manager, self.post_processor,
+                          self.formatter_manager, self.quality_checker):
+            if hasattr(component, '__exit__'):
+                component.__exit__(*exc_info)
+        if self.cache is not None:
+            self.cache.close()
+    
+    def setup_cache(self):
+        """Инициализация дискового кэша результатов распознавания"""
+        self.cache = None
+        self.cache_hits = 0
+        self.cache_lookups = 0
+        self.cache_stats_lock = threading.Lock()
+        
+        cache_config = self.config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return
+        
+        try:
+            # diskcache дает LRU, TTL и безопасный доступ из нескольких процессов
+            import diskcache
+        except ImportError:
+            logger.warning("Библиотека diskcache не установлена. Кэш распознавания отключен.")
+            return
+        
+        self.cache = diskcache.Cache(
+            cache_config.get('dir', '.transcription_cache'),
+            size_limit=cache_config.get('max_bytes', 1024 ** 3),
+            eviction_policy='least-recently-used'
+        )
+        self.cache_ttl = cache_config.get('ttl', 30 * 24 * 3600)
+        logger.info(f"Кэш распознавания: {self.cache.directory}")
+    
+    def get_cache_key(self, audio_path: str, provider: str, language: Optional[str],
+                      duration: float) -> str:
+        """Ключ кэша: отпечаток аудио и его длительность + провайдер и его модель + язык"""
+        # Смена модели в конфигурации не должна возвращать распознавание старой моделью
+        model = self.config.get('providers', {}).get(provider, {}).get('model', 'default')
+        return f"{fingerprint_file(audio_path)}:{duration:.3f}:{provider}:{model}:{language or 'auto'}"
+    
+    def transcribe_cached(self, audio_path: str, provider: str,
+                          language: Optional[str] = None,
+                          duration: float = 0.0) -> Tuple[Dict, bool]:
+        """Транскрибация с использованием кэша. Возвращает результат и признак попадания в кэш"""
+        if self.cache is None:
+            return self.transcribe_with_retry(audio_path, provider=provider, language=language), False
+        
+        key = self.get_cache_key(audio_path, provider, language, duration)
+        # В кэше лежат готовые байты: diskcache хранит их как есть, без pickle.
+        # Ошибка кэша не должна ронять обработку файла: считаем ее промахом
+        try:
+            cached = self.cache.get(key)
+            hit = isinstance(cached, bytes)
+            if hit:
+                transcription = load_transcription(cached)
+        except Exception as e:
+            logger.warning(f"Ошибка чтения кэша распознавания: {e}")
+            hit = False
+        
+        with self.cache_stats_lock:
+            self.cache_lookups += 1
+            self.cache_hits += hit
+        
+        if hit:
+            logger.info("Результат распознавания взят из кэша")
+            return transcription, True
+        
+        transcription = self.transcribe_with_retry(audio_path, provider=provider, language=language)
+        try:
+            self.cache.set(key, dump_transcription(transcription), expire=self.cache_ttl)
+        except Exception as e:
+            # Распознавание уже выполнено (и оплачено), результат возвращаем и без кэша
+            logger.warning(f"Не удалось сохранить результат распознавания в кэш: {e}")
+        return transcription, False
+    
+    @property
+    def cache_hit_rate(self) -> float:
+        """Доля обращений к кэшу распознавания, обслуженных из кэша"""
+        with self.cache_stats_lock:
+            return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+    
     def process_file(self, input_path: str, output_dir: str = "output",
                     language: str = None, provider: str = "auto") -> Dict:
         """
@@ -85,61 +342,76 @@ class AutoSubtitleGenerator:
             logger.info(f"Начало обработки: {input_path}")
             
             # 1. Создание выходной директории
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            out_dir = Path(output_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stem = Path(input_path).stem
             
             # 2. Подготовка аудио
             logger.info("Этап 1: Подготовка аудио...")
-            audio_info = self.audio_processor.process(input_path, output_dir)
-            
-            # 3. Выбор лучшего провайдера
-            if provider == "auto":
-                provider = self.transcription_manager.select_best_provider(
-                    audio_info['duration'],
-                    audio_info['size_mb']
+            # Промежуточные файлы пишутся в отдельную временную директорию вызова
+            audio_info = self.audio_processor.process(input_path)
+            try:
+                # 3. Выбор лучшего провайдера
+                if provider == "auto":
+                    provider = self.component('transcription_manager').select_best_provider(
+                        audio_info['duration'],
+                        audio_info['size_mb']
+                    )
+                logger.info(f"Выбран провайдер: {provider}")
+                
+                # 4. Транскрибация
+                logger.info("Этап 2: Распознавание речи...")
+                transcription, cache_hit = self.transcribe_cached(
+                    audio_info['processed_path'],
+                    provider=provider,
+                    language=language,
+                    duration=audio_info['duration']
                 )
-            logger.info(f"Выбран провайдер: {provider}")
-            
-            # 4. Транскрибация
-            logger.info("Этап 2: Распознавание речи...")
-            transcription = self.transcription_manager.transcribe(
-                audio_info['processed_path'],
-                provider=provider,
-                language=language
-            )
+            finally:
+                # Обработанный WAV больше не нужен: не держим его во временной директории до конца пакета
+                shutil.rmtree(Path(audio_info['processed_path']).parent, ignore_errors=True)
             
             # 5. Пост-обработка
             logger.info("Этап 3: Пост-обработка текста...")
-            processed_data = self.post_processor.process(transcription)
+            processed_data = self.component('post_processor').process(transcription)
             
             # 6. Контроль качества
             logger.info("Этап 4: Проверка качества...")
-            quality_report = self.quality_checker.check(processed_data['segments'])
+            quality_checker = self.component('quality_checker')
+            quality_report = quality_checker.check(processed_data['segments'])
             
             # Автоматическая коррекция при необходимости
             if quality_report['total_issues'] > 0:
                 logger.warning(f"Обнаружено проблем: {quality_report['total_issues']}")
                 if quality_report['errors']:
-                    processed_data['segments'] = self.quality_checker.auto_correct(
+                    processed_data['segments'] = quality_checker.auto_correct(
                         processed_data['segments']
                     )
             
             # 7. Генерация файлов
             logger.info("Этап 5: Создание файлов субтитров...")
-            output_files = {}
+            formats = self.cfg.output_formats
+            segments = processed_data['segments']
+            # Один форматтер потока, вызвавшего process_file; его вызовы из пула идут под блокировкой,
+            # а запись файлов выполняется параллельно
+            formatter = self.component('formatter_manager')
+            format_lock = threading.Lock()
             
-            for format_name in self.config['output_formats']['enabled']:
-                output_path = Path(output_dir) / f"{Path(input_path).stem}.{format_name}"
-                content = self.formatter_manager.format(
-                    processed_data['segments'],
-                    format_name
-                )
+            def write_format(format_name: str) -> Tuple[str, str]:
+                output_path = out_dir / f"{stem}.{format_name}"
+                with format_lock:
+                    content = formatter.format(segments, format_name)
                 
                 output_path.write_text(content, encoding='utf-8-sig')
-                output_files[format_name] = str(output_path)
                 logger.info(f"Создан файл: {output_path}")
+                return format_name, str(output_path)
+            
+            # Форматы независимы: запись одного перекрывается с форматированием другого
+            with ThreadPoolExecutor(max_workers=max(1, len(formats))) as executor:
+                output_files = dict(executor.map(write_format, formats))
             
             # 8. Генерация отчета
-            report_path = Path(output_dir) / f"{Path(input_path).stem}_report.txt"
+            report_path = out_dir / f"{stem}_report.txt"
             self.generate_report(
                 report_path,
                 audio_info,
@@ -161,7 +433,9 @@ class AutoSubtitleGenerator:
                     'words': len(processed_data.get('words', [])),
                     'segments': len(processed_data['segments']),
                     'provider': provider,
-                    'language': transcription.get('language', 'unknown')
+                    'language': transcription.get('language', 'unknown'),
+                    'cache_hit': cache_hit,
+                    'cache_hit_rate': self.cache_hit_rate
                 },
                 'quality_report': quality_report
             }
@@ -174,10 +448,51 @@ class AutoSubtitleGenerator:
                 'input_file': input_path
             }
     
+    def get_rate_limiter(self, provider: str) -> RateLimiter:
+        """Общий для всех потоков ограничитель запросов к провайдеру"""
+        with self.rate_limiters_lock:
+            if provider not in self.rate_limiters:
+                limits = self.config.get('rate_limits', {}).get(provider, {})
+                self.rate_limiters[provider] = RateLimiter(
+                    rps=limits.get('rps', 2),
+                    max_concurrent=limits.get('max_concurrent', 5)
+                )
+            return self.rate_limiters[provider]
+    
+    def transcribe_with_retry(self, audio_path: str, provider: str,
+                              language: Optional[str] = None) -> Dict:
+        """Транскрибация с ограничением частоты запросов и повтором при временных ошибках"""
+        retry = self.config.get('retry', {})
+        attempts = retry.get('attempts', 3)
+        min_wait = retry.get('min_wait', 2)
+        max_wait = retry.get('max_wait', 60)
+        limiter = self.get_rate_limiter(provider)
+        
+        for attempt in range(1, attempts + 1):
+            try:
+                with limiter:
+                    return self.component('transcription_manager').transcribe(
+                        audio_path,
+                        provider=provider,
+                        language=language
+                    )
+            except Exception as e:
+                if attempt == attempts or not is_transient_error(e):
+                    raise
+                wait = min(max_wait, min_wait * 2 ** (attempt - 1))
+                logger.warning(f"Временная ошибка провайдера {provider} ({e}), "
+                               f"повтор через {wait} сек (попытка {attempt}/{attempts})")
+                time.sleep(wait)
+    
     def generate_report(self, report_path: Path, audio_info: Dict, 
                        transcription: Dict, processed_data: Dict,
                        quality_report: Dict, output_files: Dict):
         """Генерация подробного отчета о процессе"""
+        segments = processed_data['segments']
+        words = processed_data.get('words') or ()
+        n_segments = len(segments)
+        total_chars = sum(len(s['text']) for s in segments)
+        
         report_content = [
             "=" * 60,
             "ОТЧЕТ О ГЕНЕРАЦИИ СУБТИТРОВ",
@@ -189,8 +504,8 @@ class AutoSubtitleGenerator:
             f"\n--- РАСПОЗНАВАНИЕ РЕЧИ ---",
             f"Провайдер: {transcription.get('provider', 'unknown')}",
             f"Язык: {transcription.get('language', 'auto')}",
-            f"Распознано слов: {len(processed_data.get('words', []))}",
-            f"Сегментов: {len(processed_data['segments'])}",
+            f"Распознано слов: {len(words)}",
+            f"Сегментов: {n_segments}",
             f"\n--- КАЧЕСТВО ---",
             f"Всего проблем: {quality_report['total_issues']}",
             f"Ошибки: {len(quality_report['errors'])}",
@@ -212,18 +527,18 @@ class AutoSubtitleGenerator:
             report_content.append(f"{format_name.upper()}: {filepath}")
         
         report_content.append(f"\n--- СТАТИСТИКА ---")
-        total_chars = sum(len(s['text']) for s in processed_data['segments'])
         report_content.append(f"Всего символов: {total_chars}")
         report_content.append(f"Символов/сек: {total_chars/audio_info['duration']:.1f}")
         
-        if processed_data.get('words'):
-            words_per_min = len(processed_data['words']) / (audio_info['duration'] / 60)
+        if words:
+            words_per_min = len(words) / (audio_info['duration'] / 60)
             report_content.append(f"Слов/минуту: {words_per_min:.1f}")
         
         report_content.append(f"\n{'='*60}")
         report_content.append(f"Сгенерировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        report_path.write_text('\n'.join(report_content), encoding='utf-8')
+        with open(report_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(line + '\n' for line in report_content)
     
     def batch_process(self, input_dir: str, output_dir: str = "output_batch",
                      file_patterns: List[str] = None) -> List[Dict]:
@@ -231,19 +546,41 @@ class AutoSubtitleGenerator:
         if file_patterns is None:
             file_patterns = ['*.mp3', '*.wav', '*.mp4', '*.m4a']
         
-        results = []
-        input_path = Path(input_dir)
-        
-        for pattern in file_patterns:
-            for file_path in input_path.glob(pattern):
-                if file_path.is_file():
-                    logger.info(f"Обработка файла: {file_path}")
-                    
-                    result = self.process_file(
-                        str(file_path),
-                        output_dir=Path(output_dir) / file_path.stem
-                    )
-                    results.append(result)
+        # Шаблоны вида '*.ext' (без '*?[' и второй точки) сводим к набору расширений,
+        # остальные ('*.mp[34]', '*.tar.gz', ...) проверяются через fnmatch
+        def is_plain_suffix(pattern: str) -> bool:
+            return pattern.startswith('*.') and not any(c in pattern[2:] for c in '*?[.')
+        
+        suffixes = frozenset(p[1:].lower() for p in file_patterns if is_plain_suffix(p))
+        other_patterns = [p for p in file_patterns if not is_plain_suffix(p)]
+        
+        with os.scandir(input_dir) as entries:
+            files = sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file(follow_symlinks=False) and (
+                    os.path.splitext(entry.name)[1].lower() in suffixes
+                    or any(fnmatch.fnmatch(entry.name, p) for p in other_patterns)
+                )
+            )
+        
+        # talk.mp3 и talk.wav обрабатываются одновременно: при совпадении имен
+        # в имя директории добавляется расширение, чтобы файлы не перезаписывали друг друга
+        stem_counts = Counter(file_path.stem for file_path in files)
+        
+        def process_one(file_path: Path) -> Dict:
+            logger.info(f"Обработка файла: {file_path}")
+            name = file_path.stem
+            if stem_counts[name] > 1:
+                name = f"{name}_{file_path.suffix.lstrip('.')}"
+            return self.process_file(
+                str(file_path),
+                output_dir=Path(output_dir) / name
+            )
+        
+        # Файлы обрабатываются параллельно: основное время уходит на ожидание ответа ASR
+        with ThreadPoolExecutor(max_workers=self.cfg.max_concurrency) as executor:
+            results = list(executor.map(process_one, files))
         
         # Генерация сводного отчета
         self.generate_batch_report(results, output_dir)
@@ -275,13 +612,16 @@ class AutoSubtitleGenerator:
                 f"Слов в минуту: {total_words/(total_duration/60):.1f}"
             ])
         
-        if failed:
-            report_content.append("\n--- ФАЙЛЫ С ОШИБКАМИ ---")
-            for fail in failed:
-                report_content.append(f"  • {fail['input_file']}: {fail['error']}")
-        
         report_path = Path(output_dir) / "batch_report.txt"
-        report_path.write_text('\n'.join(report_content), encoding='utf-8')
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Список ошибок может быть длинным: пишем его построчно, не собирая в одну строку
+        with open(report_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(line + '\n' for line in report_content)
+            if failed:
+                f.write("\n--- ФАЙЛЫ С ОШИБКАМИ ---\n")
+                for fail in failed:
+                    f.write(f"  • {fail['input_file']}: {fail['error']}\n")
         
         logger.info(f"Сводный отчет сохранен: {report_path}")
 
@@ -317,40 +657,30 @@ def main():
         logger.error(f"Ошибка инициализации: {e}")
         sys.exit(1)
     
-    # Обработка
-    if args.batch and os.path.isdir(args.input):
-        logger.info(f"Пакетная обработка директории: {args.input}")
-        results = generator.batch_process(args.input, args.output)
-        
-        successful = len([r for r in results if r['success']])
-        logger.info(f"Обработка завершена. Успешно: {successful}/{len(results)}")
-    else:
-        logger.info(f"Обработка файла: {args.input}")
-        result = generator.process_file(
-            args.input,
-            args.output,
-            args.language,
-            args.provider
-        )
-        
-        if result['success']:
-            logger.info(f"Файлы сохранены в: {args.output}")
-            for format_name, filepath in result['output_files'].items():
-                logger.info(f"  {format_name.upper()}: {filepath}")
+    # Обработка (временные файлы удаляются при выходе из блока)
+    with generator:
+        if args.batch and os.path.isdir(args.input):
+            logger.info(f"Пакетная обработка директории: {args.input}")
+            results = generator.batch_process(args.input, args.output)
+            
+            successful = len([r for r in results if r['success']])
+            logger.info(f"Обработка завершена. Успешно: {successful}/{len(results)}")
         else:
-            logger.error(f"Ошибка: {result['error']}")
-            sys.exit(1)
+            logger.info(f"Обработка файла: {args.input}")
+            result = generator.process_file(
+                args.input,
+                args.output,
+                args.language,
+                args.provider
+            )
+            
+            if result['success']:
+                logger.info(f"Файлы сохранены в: {args.output}")
+                for format_name, filepath in result['output_files'].items():
+                    logger.info(f"  {format_name.upper()}: {filepath}")
+            else:
+                logger.error(f"Ошибка: {result['error']}")
+                sys.exit(1)
 
 if __name__ == "__main__":
-    from datetime import datetime
-    
-    # Проверка наличия необходимых модулей
-    try:
-        import yaml
-        import pydub
-    except ImportError as e:
-        print(f"Ошибка: Не установлены необходимые библиотеки: {e}")
-        print("Установите их: pip install -r requirements.txt")
-        sys.exit(1)
-    
     main()
\ No newline at end of file
@@ -3,22 +3,22 @@
 """
 
 import os
+import shutil
 import tempfile
+import weakref
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Dict, Tuple, Optional
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 import ffmpeg
-import librosa
 import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
-from pydub.effects import normalize
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AudioInfo:
     """Информация об аудиофайле"""
     source_path: str
@@ -34,10 +34,38 @@ class AudioProcessor:
     
     SUPPORTED_FORMATS = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.mp4', '.avi', '.mkv', '.mov']
     
-    def __init__(self, config: Dict):
+    # Шумоподавление выполняется окнами такой длины (сек) с таким перекрытием (сек)
+    NOISE_WINDOW_SEC = 60
+    NOISE_OVERLAP_SEC = 1
+    
+    def __init__(self, config: Dict, settings=None):
+        """
+        Args:
+            config: Словарь конфигурации
+            settings: Уже проверенные параметры (ValidatedConfig из main.py);
+                без них параметры читаются из config['audio_preprocessing']
+        """
         self.config = config
+        
+        # Параметры горячего пути читаются из конфигурации один раз
+        if settings is None:
+            settings = SimpleNamespace(**config['audio_preprocessing'])
+        self.normalize = settings.normalize
+        self.noise_reduction = settings.noise_reduction
+        self.target_sample_rate = settings.target_sample_rate
+        self.channels = settings.channels
+        
         self.temp_dir = tempfile.mkdtemp(prefix="subtitle_audio_")
         logger.info(f"Временная директория для аудио: {self.temp_dir}")
+        
+        # Удаление директории при сборке мусора, при выходе из интерпретатора или явном вызове
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.temp_dir, ignore_errors=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.cleanup_temp_files()
     
     def process(self, input_path: str, output_dir: str = None) -> AudioInfo:
         """
@@ -46,6 +74,7 @@ class AudioProcessor:
         Args:
             input_path: Путь к входному файлу
             output_dir: Директория для сохранения обработанного файла
+                (по умолчанию - отдельная временная директория на каждый вызов)
             
         Returns:
             AudioInfo с информацией о файле
@@ -59,25 +88,21 @@ class AudioProcessor:
         # Извлечение информации о файле
         audio_info = self.analyze_audio(input_path)
         
-        # Обработка в зависимости от типа файла
-        if self.is_video_file(input_path):
+        # Отдельная временная поддиректория на вызов: параллельные вызовы не пересекаются
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        
+        # Обработка в зависимости от типа файла и включенных фильтров
+        if self.normalize or self.noise_reduction:
+            # Декодированный звук идет из ffmpeg сразу в память, без промежуточного WAV
+            processed_path = self.apply_filters(input_path, output_dir)
+        elif self.is_video_file(input_path):
             processed_path = self.extract_audio_from_video(input_path, output_dir)
         else:
             processed_path = self.prepare_audio_file(input_path, output_dir)
         
-        audio_info.processed_path = processed_path
-        
-        # Дополнительная обработка при необходимости
-        if self.config['audio_preprocessing']['normalize']:
-            processed_path = self.normalize_audio(processed_path)
-            audio_info.processed_path = processed_path
-        
-        if self.config['audio_preprocessing']['noise_reduction']:
-            processed_path = self.reduce_noise(processed_path)
-            audio_info.processed_path = processed_path
-        
         logger.info(f"Аудио обработано: {processed_path}")
-        return audio_info
+        return replace(audio_info, processed_path=processed_path)
     
     def is_supported_format(self, filepath: str) -> bool:
         """Проверка поддержки формата файла"""
@@ -92,15 +117,21 @@ class AudioProcessor:
     def analyze_audio(self, filepath: str) -> AudioInfo:
         """Анализ аудиофайла и извлечение информации"""
         try:
-            # Используем librosa для получения информации
-            duration = librosa.get_duration(path=filepath)
-            
-            # Используем soundfile для более точной информации
-            with sf.SoundFile(filepath) as f:
-                sample_rate = f.samplerate
-                channels = f.channels
-                frames = f.frames
-                format_info = str(f.format)
+            # Одно чтение заголовка вместо librosa.get_duration + повторного открытия файла
+            try:
+                info = sf.info(filepath)
+                duration = info.frames / info.samplerate
+                sample_rate = info.samplerate
+                channels = info.channels
+                format_info = str(info.format)
+            except RuntimeError:
+                # Контейнеры, которые не читает soundfile (mp4, mkv, ...): один вызов ffprobe
+                probe = ffmpeg.probe(filepath)
+                stream = next(s for s in probe['streams'] if s.get('codec_type') == 'audio')
+                duration = float(stream.get('duration') or probe['format']['duration'])
+                sample_rate = int(stream['sample_rate'])
+                channels = int(stream['channels'])
+                format_info = probe['format']['format_name']
             
             # Размер файла
             size_mb = os.path.getsize(filepath) / (1024 * 1024)
@@ -119,6 +150,19 @@ class AudioProcessor:
             logger.error(f"Ошибка анализа аудиофайла {filepath}: {e}")
             raise
     
+    def _ffmpeg_to_wav(self, input_path: str, output_path: Path) -> str:
+        """Декодирование в WAV (PCM 16 бит) с целевой частотой и числом каналов одним вызовом ffmpeg"""
+        stream = ffmpeg.input(input_path)
+        stream = ffmpeg.output(
+            stream,
+            str(output_path),
+            acodec='pcm_s16le',
+            ac=self.channels,
+            ar=self.target_sample_rate
+        )
+        ffmpeg.run(stream, capture_stdout=True, capture_stderr=True, overwrite_output=True)
+        return str(output_path)
+    
     def extract_audio_from_video(self, video_path: str, output_dir: str = None) -> str:
         """Извлечение аудиодорожки из видео"""
         logger.info(f"Извлечение аудио из видео: {video_path}")
@@ -130,15 +174,7 @@ class AudioProcessor:
         
         try:
             # Используем ffmpeg для извлечения аудио
-            stream = ffmpeg.input(video_path)
-            stream = ffmpeg.output(
-                stream,
-                str(output_path),
-                acodec='pcm_s16le',
-                ac=self.config['audio_preprocessing']['channels'],
-                ar=self.config['audio_preprocessing']['target_sample_rate']
-            )
-            ffmpeg.run(stream, capture_stdout=True, capture_stderr=True)
+            self._ffmpeg_to_wav(video_path, output_path)
             
             logger.info(f"Аудио извлечено: {output_path}")
             return str(output_path)
@@ -157,112 +193,144 @@ class AudioProcessor:
         output_path = Path(output_dir) / f"{Path(audio_path).stem}_prepared.wav"
         
         try:
-            # Загрузка аудио
-            audio = AudioSegment.from_file(audio_path)
-            
-            # Применяем настройки
-            target_sample_rate = self.config['audio_preprocessing']['target_sample_rate']
-            target_channels = self.config['audio_preprocessing']['channels']
-            
-            # Конвертация в моно при необходимости
-            if target_channels == 1 and audio.channels > 1:
-                audio = audio.set_channels(1)
-            
-            # Ресемплинг при необходимости
-            if audio.frame_rate != target_sample_rate:
-                audio = audio.set_frame_rate(target_sample_rate)
-            
-            # Экспорт в WAV
-            audio.export(
-                str(output_path),
-                format="wav",
-                parameters=["-acodec", "pcm_s16le"]
-            )
+            # Ресемплинг и сведение каналов выполняет ffmpeg, без загрузки всего PCM в память Python
+            self._ffmpeg_to_wav(audio_path, output_path)
             
             logger.info(f"Аудио подготовлено: {output_path}")
             return str(output_path)
             
+        except ffmpeg.Error as e:
+            logger.error(f"Ошибка ffmpeg при подготовке аудио: {e.stderr.decode()}")
+            raise
         except Exception as e:
             logger.error(f"Ошибка подготовки аудио: {e}")
             raise
     
-    def normalize_audio(self, audio_path: str) -> str:
-        """Нормализация громкости аудио"""
-        logger.info(f"Нормализация громкости: {audio_path}")
+    def apply_filters(self, input_path: str, output_dir: str) -> str:
+        """
+        Нормализация и шумоподавление за один проход:
+        файл декодируется один раз, обработка идет в памяти, результат записывается один раз
+        """
+        logger.info(f"Обработка аудио фильтрами: {input_path}")
         
-        output_path = Path(audio_path).parent / f"{Path(audio_path).stem}_normalized.wav"
+        output_path = Path(output_dir) / f"{Path(input_path).stem}_processed.wav"
         
         try:
-            # Загрузка аудио
-            audio = AudioSegment.from_file(audio_path)
-            
-            # Нормализация
-            normalized = normalize(audio)
-            
-            # Экспорт
-            normalized.export(
-                str(output_path),
-                format="wav",
-                parameters=["-acodec", "pcm_s16le"]
-            )
-            
-            # Удаляем оригинальный файл, если он временный
-            if str(audio_path).startswith(self.temp_dir):
-                os.remove(audio_path)
+            audio, sample_rate = self._process_pipeline(input_path)
+            sf.write(str(output_path), audio, sample_rate, subtype='PCM_16')
             
-            logger.info(f"Аудио нормализовано: {output_path}")
+            logger.info(f"Аудио обработано фильтрами: {output_path}")
             return str(output_path)
             
-        except Exception as e:
-            logger.error(f"Ошибка нормализации: {e}")
-            return audio_path  # Возвращаем оригинальный файл при ошибке
+        except ffmpeg.Error as e:
+            logger.error(f"Ошибка ffmpeg при декодировании аудио: {e.stderr.decode()}")
+            raise
     
-    def reduce_noise(self, audio_path: str) -> str:
-        """Подавление шума в аудио"""
-        logger.info(f"Подавление шума: {audio_path}")
+    def decode_audio(self, input_path: str) -> Tuple[np.ndarray, int]:
+        """Декодирование файла в массив float32 через pipe ffmpeg (PCM 16 бит в stdout)"""
+        sample_rate = self.target_sample_rate
+        channels = self.channels
+        
+        stream = ffmpeg.input(input_path)
+        stream = ffmpeg.output(stream, 'pipe:', format='s16le', acodec='pcm_s16le',
+                               ac=channels, ar=sample_rate)
+        raw, _ = ffmpeg.run(stream, capture_stdout=True, capture_stderr=True)
+        
+        # Масштабирование на месте: рядом с PCM из ffmpeg живет один буфер float32, без временных копий
+        audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+        del raw
+        audio *= 1 / 32768.0
+        if channels > 1:
+            audio = audio.reshape(-1, channels)
+        return audio, sample_rate
+    
+    def _process_pipeline(self, input_path: str) -> Tuple[np.ndarray, int]:
+        """Декодирование аудио и применение включенных в конфигурации фильтров к массиву"""
+        audio, sample_rate = self.decode_audio(input_path)
+        
+        if self.normalize:
+            audio = self.normalize_audio(audio)
+        
+        if self.noise_reduction:
+            audio = self.reduce_noise(audio, sample_rate)
+        
+        return audio, sample_rate
+    
+    def normalize_audio(self, audio: np.ndarray, headroom_db: float = 0.1) -> np.ndarray:
+        """Нормализация громкости по пиковому значению (как pydub.effects.normalize)"""
+        logger.info("Нормализация громкости")
+        
+        peak = np.max(np.abs(audio)) if audio.size else 0.0
+        if peak > 0:
+            audio *= (10 ** (-headroom_db / 20)) / peak
+        return audio
+    
+    def reduce_noise(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Подавление шума в аудио. Результат пишется на место входного массива,
+        поэтому при ошибке посреди обработки исключение пробрасывается дальше:
+        частично обработанный сигнал не должен попасть в выходной файл
+        """
+        logger.info("Подавление шума")
         
         try:
             # Пытаемся использовать noisereduce, если установлен
             import noisereduce as nr
             
-            # Загрузка аудио
-            audio, sample_rate = librosa.load(audio_path, sr=None)
-            
-            if len(audio.shape) > 1:
-                audio = librosa.to_mono(audio)
+            if audio.ndim > 1:
+                audio = audio.mean(axis=1, dtype=np.float32)
             
-            # Определение участка шума (первые 0.5 секунды)
+            # Определение участка шума (первые 0.5 секунды) - один профиль на весь файл
             noise_samples = int(0.5 * sample_rate)
             if len(audio) > noise_samples:
-                noise_clip = audio[:noise_samples]
+                noise_clip = audio[:noise_samples].copy()
             else:
-                noise_clip = audio[:len(audio)//10]  # 10% от файла
+                noise_clip = audio[:len(audio)//10].copy()  # 10% от файла
             
-            # Применение шумоподавления
-            reduced_noise = nr.reduce_noise(
-                y=audio,
-                sr=sample_rate,
-                y_noise=noise_clip,
-                prop_decrease=0.75  # Уменьшение шума на 75%
-            )
-            
-            # Сохранение результата
-            output_path = Path(audio_path).parent / f"{Path(audio_path).stem}_denoised.wav"
-            sf.write(output_path, reduced_noise, sample_rate)
+            # Обработка окнами с перекрытием: память STFT в noisereduce ограничена размером окна.
+            # Весь сигнал при этом остается в памяти (он нужен целиком для нормализации),
+            # но результат пишется на место исходного массива, второго буфера такой же длины нет
+            window = int(self.NOISE_WINDOW_SEC * sample_rate)
+            overlap = int(self.NOISE_OVERLAP_SEC * sample_rate)
+            step = window - overlap
+            fade_in = (0.5 - 0.5 * np.cos(np.linspace(0, np.pi, overlap))).astype(np.float32)
+            fade_out = fade_in[::-1]
             
-            # Удаляем оригинальный файл, если он временный
-            if str(audio_path).startswith(self.temp_dir):
-                os.remove(audio_path)
+            # Хвост предыдущего окна: участок перекрытия еще нужен следующему окну как исходный сигнал
+            pending = None
+            for start in range(0, len(audio), step):
+                chunk = audio[start:start + window]
+                
+                # Применение шумоподавления
+                reduced = nr.reduce_noise(
+                    y=chunk,
+                    sr=sample_rate,
+                    y_noise=noise_clip,
+                    prop_decrease=0.75  # Уменьшение шума на 75%
+                ).astype(np.float32, copy=False)
+                
+                # Плавный переход (окно Ханна) между соседними окнами, сумма весов равна 1
+                is_last = start + window >= len(audio)
+                if pending is not None:
+                    head = reduced[:len(pending)]
+                    head *= fade_in[:len(head)]
+                    head += pending[:len(head)]
+                if is_last:
+                    audio[start:start + len(reduced)] = reduced
+                    break
+                
+                audio[start:start + step] = reduced[:step]
+                pending = reduced[step:] * fade_out
             
-            logger.info(f"Шумоподавление завершено: {output_path}")
-            return str(output_path)
+            logger.info("Шумоподавление завершено")
+            return audio
             
         except ImportError:
             logger.warning("Библиотека noisereduce не установлена. Пропускаем шумоподавление.")
-            return audio_path
+            return audio
         except Exception as e:
             logger.error(f"Ошибка шумоподавления: {e}")
-            return audio_path
+            raise
     
     def split_large_file(self, audio_path: str, max_duration: int = 300) -> list:
         """
@@ -273,50 +341,50 @@ class AudioProcessor:
             max_duration: Максимальная длительность части в секундах
             
         Returns:
-            Список путей к частям файла
+            Список путей к частям файла (во временной директории процессора)
         """
         logger.info(f"Разделение файла на части: {audio_path}")
         
+        source = Path(audio_path)
+        # Свежая директория на каждый вызов: в результат не попадут части прошлых разбиений
+        parts_dir = Path(tempfile.mkdtemp(prefix="parts_", dir=self.temp_dir))
+        pattern = parts_dir / f"{source.stem.replace('%', '%%')}_part%03d.wav"
+        segment_list = parts_dir / "segments.txt"
+        
+        # PCM из WAV копируется без перекодирования, остальные форматы декодируются в PCM
+        codec = {'c': 'copy'} if source.suffix.lower() == '.wav' else {'acodec': 'pcm_s16le'}
+        
         try:
-            audio = AudioSegment.from_file(audio_path)
-            duration_ms = len(audio)
-            max_duration_ms = max_duration * 1000
+            # Один вызов ffmpeg с сегментирующим muxer вместо полного декодирования в pydub
+            stream = ffmpeg.input(audio_path)
+            stream = ffmpeg.output(
+                stream,
+                str(pattern),
+                f='segment',
+                segment_time=max_duration,
+                segment_list=str(segment_list),
+                segment_list_type='flat',
+                reset_timestamps=1,
+                **codec
+            )
+            ffmpeg.run(stream, capture_stdout=True, capture_stderr=True, overwrite_output=True)
             
-            parts = []
-            
-            for i in range(0, duration_ms, max_duration_ms):
-                start_ms = i
-                end_ms = min(i + max_duration_ms, duration_ms)
-                
-                part = audio[start_ms:end_ms]
-                part_path = Path(audio_path).parent / f"{Path(audio_path).stem}_part{i//max_duration_ms}.wav"
-                
-                part.export(
-                    str(part_path),
-                    format="wav",
-                    parameters=["-acodec", "pcm_s16le"]
-                )
-                
-                parts.append(str(part_path))
-                logger.info(f"Создана часть {len(parts)}: {part_path}")
+            # Список частей ровно в том порядке, в котором их записал ffmpeg
+            with open(segment_list, encoding='utf-8') as f:
+                parts = [str(parts_dir / Path(line.strip()).name) for line in f if line.strip()]
             
             logger.info(f"Файл разделен на {len(parts)} частей")
             return parts
             
+        except ffmpeg.Error as e:
+            logger.error(f"Ошибка ffmpeg при разделении файла: {e.stderr.decode()}")
+            raise
         except Exception as e:
             logger.error(f"Ошибка разделения файла: {e}")
             raise
     
     def cleanup_temp_files(self):
         """Очистка временных файлов"""
-        try:
-            import shutil
-            if os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
-                logger.info(f"Временная директория очищена: {self.temp_dir}")
-        except Exception as e:
-            logger.warning(f"Не удалось очистить временные файлы: {e}")
-    
-    def __del__(self):
-        """Деструктор для очистки временных файлов"""
-        self.cleanup_temp_files()
\ No newline at end of file
+        if self._finalizer.alive:
+            self._finalizer()
+            logger.info(f"Временная директория очищена: {self.temp_dir}")
\ No newline at end of file